@@ -10,10 +10,12 @@ load_dotenv()
 BASE_DIR = Path(__file__).parent
 OUTPUT_DIR = BASE_DIR / "output"
 LOG_DIR = BASE_DIR / "logs"
+CACHE_DIR = OUTPUT_DIR / ".cache"
 
 # Ensure directories exist
 OUTPUT_DIR.mkdir(exist_ok=True)
 LOG_DIR.mkdir(exist_ok=True)
+CACHE_DIR.mkdir(exist_ok=True)
 
 # Database connection
 DB_CONFIG = {
@@ -24,8 +26,15 @@ DB_CONFIG = {
     "port": os.getenv("DB_PORT", "3306")
 }
 
-# Output file
-OUTPUT_FILE = OUTPUT_DIR / "forecasted_data.xlsx"
+# Output files - Parquet is the primary output, the Excel copies are for people/dashboards
+OUTPUT_FILE = OUTPUT_DIR / "forecasted_data.parquet"
+OUTPUT_XLSX = OUTPUT_DIR / "business_forecast.xlsx"
+SUMMARY_FILE = OUTPUT_DIR / "business_monthly_summary.parquet"
+SUMMARY_XLSX = OUTPUT_DIR / "business_monthly_summary.xlsx"
+EMIT_XLSX = os.getenv("EMIT_XLSX", "1") == "1"
+
+# Exponential smoothing backend: "statsmodels" (default) or "statsforecast" (AutoETS, optional dependency)
+ETS_BACKEND = os.getenv("ETS_BACKEND", "statsmodels")
 
 # Log file
 LOG_FILE = LOG_DIR / "process.log"
\ No newline at end of file
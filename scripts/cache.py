@@ -0,0 +1,42 @@
+# scripts/cache.py
+import hashlib
+import pandas as pd
+from scripts.logging_setup import logger
+from config import CACHE_DIR
+
+def cached_stage(name, key, compute_fn):
+    """
+    Return the cached result of a pipeline stage, computing and caching it if needed
+
+    Parameters:
+    - name: Name of the stage, used as the cache file prefix
+    - key: String identifying the stage inputs; a different key forces recomputation
+    - compute_fn: Function with no arguments returning the stage DataFrame
+
+    Returns:
+    - DataFrame produced by compute_fn (or read back from the cache)
+    """
+    # Hash the key so it is always a valid filename
+    key_hash = hashlib.sha1(str(key).encode('utf-8')).hexdigest()[:16]
+    cache_file = CACHE_DIR / f"{name}_{key_hash}.parquet"
+
+    if cache_file.exists():
+        try:
+            df = pd.read_parquet(cache_file)
+            logger.info("Loaded %s from cache: %s", name, cache_file)
+            return df
+        except Exception as e:
+            logger.warning("Could not read cache file %s, recomputing: %s", cache_file, e)
+
+    df = compute_fn()
+
+    try:
+        # Remove stale cache files for this stage before writing the new one
+        for old_file in CACHE_DIR.glob(f"{name}_*.parquet"):
+            old_file.unlink()
+        df.to_parquet(cache_file, index=False)
+        logger.info("Cached %s to %s", name, cache_file)
+    except Exception as e:
+        logger.warning("Could not write cache file %s: %s", cache_file, e)
+
+    return df
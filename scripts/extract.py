@@ -1,45 +1,140 @@
 # scripts/extract.py
 import pandas as pd
 import sqlalchemy
-from sqlalchemy import create_engine
+from functools import lru_cache
+from sqlalchemy import create_engine, text
 from scripts.logging_setup import logger
 from config import DB_CONFIG
 
+# Number of rows fetched per round trip when streaming large tables
+CHUNK_SIZE = 50_000
+
+# Only the columns the pipeline needs, compiled once at import
+BUSINESS_QUERY = text("SELECT bid, date_accredited, date_dropped FROM Business")
+
 # Modified extract.py function
+@lru_cache(maxsize=1)
 def create_connection():
-    """Create a connection to the MySQL database"""
+    """Create a connection to the MySQL database (cached so all queries share one engine)"""
     try:
         # Use the host as-is without appending the port
         connection_string = f"mysql+pymysql://{DB_CONFIG['user']}:{DB_CONFIG['password']}@{DB_CONFIG['host']}/{DB_CONFIG['database']}"
-        engine = create_engine(connection_string)
+        # Check pooled connections before use and recycle them so the cached engine survives long idles
+        engine = create_engine(connection_string, pool_pre_ping=True, pool_recycle=3600)
         logger.info("Database connection created successfully")
         return engine
     except Exception as e:
-        logger.error(f"Error creating database connection: {e}")
+        logger.error("Error creating database connection: %s", e)
         raise
 
 def extract_business():
     """Extract data from the Business table - selecting only specific columns"""
     try:
         engine = create_connection()
-        # Modified query to only select the columns you need
-        query = "SELECT bid, date_accredited, date_dropped FROM Business"
         logger.info("Extracting specific columns from Business table")
-        df = pd.read_sql(query, engine)
-        logger.info(f"Business data extracted successfully. Shape: {df.shape}")
+        # Stream the rows through a server-side cursor instead of buffering the whole result client-side,
+        # fetching in chunks and parsing the date columns directly to datetime64
+        with engine.connect().execution_options(stream_results=True) as conn:
+            chunks = pd.read_sql(
+                BUSINESS_QUERY, conn,
+                chunksize=CHUNK_SIZE,
+                parse_dates=['date_accredited', 'date_dropped']
+            )
+            df = pd.concat(chunks, ignore_index=True)
+        logger.info("Business data extracted successfully. Shape: %s", df.shape)
         return df
     except Exception as e:
-        logger.error(f"Error extracting Business data: {e}")
+        logger.error("Error extracting Business data: %s", e)
+        raise
+
+def extract_business_fingerprint():
+    """
+    Extract a cheap fingerprint of the Business table used to detect whether the data
+    changed since the last run
+    
+    Besides the latest dates and row counts, the sums of both date columns (in seconds, for
+    any date) change when a date is edited in place, e.g. a back-dated drop.
+    """
+    try:
+        engine = create_connection()
+        query = """
+            SELECT MAX(date_accredited) AS max_accredited, MAX(date_dropped) AS max_dropped,
+                   COUNT(*) AS row_count, COUNT(date_dropped) AS dropped_count,
+                   SUM(TO_SECONDS(date_accredited)) AS accredited_sum,
+                   SUM(TO_SECONDS(date_dropped)) AS dropped_sum
+            FROM Business
+        """
+        row = pd.read_sql(query, engine).iloc[0]
+        fingerprint = "|".join(str(row[col]) for col in [
+            'max_accredited', 'max_dropped', 'row_count', 'dropped_count', 'accredited_sum', 'dropped_sum'
+        ])
+        logger.info("Business table fingerprint: %s", fingerprint)
+        return fingerprint
+    except Exception as e:
+        logger.error("Error extracting Business table fingerprint: %s", e)
+        raise
+
+def extract_monthly_business_counts():
+    """
+    Extract monthly business counts aggregated in the database instead of per-row data
+    
+    Months are keyed as year * 12 + month - 1. Besides joins and drops per calendar month,
+    returns the month each business starts and stops counting as active, following the
+    rules used by create_monthly_business_summary:
+    - Active from the month it joined (the next month if it joined after midnight on the last day)
+    - Inactive from the month it dropped if dropped at the start of the month, otherwise the next month,
+      and never before the month it became active
+    
+    Returns:
+    - DataFrame with year, month, new_joins, new_drops, active_adds and active_removals columns
+    """
+    try:
+        engine = create_connection()
+        join_key = "(YEAR(date_accredited) * 12 + MONTH(date_accredited) - 1)"
+        drop_key = "(YEAR(date_dropped) * 12 + MONTH(date_dropped) - 1)"
+        active_from_key = f"({join_key} + (date_accredited > LAST_DAY(date_accredited)))"
+        inactive_from_key = f"({drop_key} + (DAYOFMONTH(date_dropped) > 1 OR date_dropped > DATE(date_dropped)))"
+        query = f"""
+            SELECT 'new_joins' AS kind, {join_key} AS month_key, COUNT(*) AS n
+            FROM Business WHERE date_accredited IS NOT NULL GROUP BY 2
+            UNION ALL
+            SELECT 'new_drops', {drop_key}, COUNT(*)
+            FROM Business WHERE date_accredited IS NOT NULL AND date_dropped IS NOT NULL GROUP BY 2
+            UNION ALL
+            SELECT 'active_adds', {active_from_key}, COUNT(*)
+            FROM Business WHERE date_accredited IS NOT NULL GROUP BY 2
+            UNION ALL
+            SELECT 'active_removals', GREATEST({active_from_key}, {inactive_from_key}), COUNT(*)
+            FROM Business WHERE date_accredited IS NOT NULL AND date_dropped IS NOT NULL GROUP BY 2
+        """
+        logger.info("Extracting monthly business counts from Business table")
+        long_df = pd.read_sql(query, engine)
+        
+        # Pivot to one row per month
+        counts_df = long_df.pivot_table(
+            index='month_key', columns='kind', values='n', aggfunc='sum', fill_value=0
+        )
+        counts_df = counts_df.reindex(
+            columns=['new_joins', 'new_drops', 'active_adds', 'active_removals'], fill_value=0
+        ).astype(int).sort_index().reset_index()
+        counts_df.insert(0, 'year', counts_df['month_key'] // 12)
+        counts_df.insert(1, 'month', counts_df['month_key'] % 12 + 1)
+        counts_df = counts_df.drop(columns='month_key')
+        
+        logger.info("Monthly business counts extracted successfully. Shape: %s", counts_df.shape)
+        return counts_df
+    except Exception as e:
+        logger.error("Error extracting monthly business counts: %s", e)
         raise
 
 def extract_custom_query(query):
     """Extract data using a custom query if needed"""
     try:
         engine = create_connection()
-        logger.info(f"Executing custom query: {query}")
+        logger.info("Executing custom query: %s", query)
         df = pd.read_sql(query, engine)
-        logger.info(f"Data extracted successfully. Shape: {df.shape}")
+        logger.info("Data extracted successfully. Shape: %s", df.shape)
         return df
     except Exception as e:
-        logger.error(f"Error executing custom query: {e}")
+        logger.error("Error executing custom query: %s", e)
         raise
\ No newline at end of file
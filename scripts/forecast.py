@@ -3,7 +3,11 @@
 import pandas as pd
 import numpy as np
 from datetime import datetime
+from functools import lru_cache
+from pandas.tseries.offsets import MonthBegin
 from scripts.logging_setup import logger
+from config import ETS_BACKEND
+from scripts.transform import prepare_summary_for_forecast, downcast_counts, COUNT_COLUMNS, MONTH_CATEGORIES
 
 def generate_business_forecast_from_summary(monthly_summary_df, forecast_periods=12, lookback_years=5, methods=None):
     """
@@ -19,143 +23,225 @@ def generate_business_forecast_from_summary(monthly_summary_df, forecast_periods
     - DataFrame with historical and forecast data
     """
     try:
-        from scripts.transform import prepare_summary_for_forecast
-        
         # Default methods
         if methods is None:
             methods = ['simple', 'ets']
         
-        logger.info(f"Generating business forecast for {forecast_periods} months using methods: {', '.join(methods)}")
+        # Resolve requested methods against the dispatch table, falling back to the simple method
+        resolved_methods = []
+        for method in methods:
+            if method not in FORECAST_METHODS:
+                logger.warning("Unknown forecasting method '%s', using 'simple' instead", method)
+                method = 'simple'
+            if method not in resolved_methods:
+                resolved_methods.append(method)
+        methods = resolved_methods
         
-        # Prepare data for forecasting
-        data_df = prepare_summary_for_forecast(monthly_summary_df, lookback_years)
+        logger.info("Generating business forecast for %s months using methods: %s", forecast_periods, ', '.join(methods))
         
-        # Create a copy for forecasting
-        forecast_df = data_df.copy()
+        # Prepare data for forecasting
+        data_df = downcast_counts(prepare_summary_for_forecast(monthly_summary_df, lookback_years))
         
         # Get the last date in our data
-        last_date = forecast_df['year_month'].max()
+        last_date = data_df['year_month'].max()
         
-        # Create forecast dates
+        # Create forecast dates starting with the month after the last one
         forecast_dates = pd.date_range(
-            start=last_date + pd.DateOffset(months=1),
+            start=(last_date + MonthBegin(1)).normalize(),
             periods=forecast_periods,
             freq='MS'
         )
         
-        # Create empty rows for forecast periods
+        # Create forecast rows column by column from typed arrays
+        forecast_months = forecast_dates.month.to_numpy()
         forecast_rows = pd.DataFrame({
             'year_month': forecast_dates,
-            'year': [d.year for d in forecast_dates],
-            'month': [d.month for d in forecast_dates],
-            'month_name': [d.strftime('%b') for d in forecast_dates],
-            'is_forecast': True
+            'year': forecast_dates.year.to_numpy(),
+            'month': forecast_months.astype(np.int8),
+            'month_name': pd.Categorical.from_codes(forecast_months - 1, dtype=MONTH_CATEGORIES),
+            'is_forecast': np.ones(len(forecast_dates), dtype=bool)
         })
         
-        # Apply the simple forecasting method if requested
-        if 'simple' in methods:
-            for i, row in forecast_rows.iterrows():
-                month = row['month']
-                # Get historical data for the same month
-                same_month_data = forecast_df[forecast_df['month'] == month]
-                
-                if len(same_month_data) > 0:
-                    # Calculate average joins and drops for this month
-                    avg_joins = same_month_data['new_joins'].mean()
-                    avg_drops = same_month_data['new_drops'].mean()
-                    
-                    # Apply a simple trend adjustment based on recent data
-                    recent_data = forecast_df.tail(12)  # Last year's data
-                    if len(recent_data) > 0:
-                        recent_avg_joins = recent_data['new_joins'].mean()
-                        recent_avg_drops = recent_data['new_drops'].mean()
-                        
-                        all_avg_joins = forecast_df['new_joins'].mean()
-                        all_avg_drops = forecast_df['new_drops'].mean()
-                        
-                        # Calculate trend factors
-                        join_trend_factor = recent_avg_joins / all_avg_joins if all_avg_joins > 0 else 1
-                        drop_trend_factor = recent_avg_drops / all_avg_drops if all_avg_drops > 0 else 1
-                        
-                        # Apply trend adjustment
-                        avg_joins = avg_joins * join_trend_factor
-                        avg_drops = avg_drops * drop_trend_factor
-                    
-                    # Round to integers
-                    forecast_rows.at[i, 'simple_joins'] = round(avg_joins)
-                    forecast_rows.at[i, 'simple_drops'] = round(avg_drops)
-                else:
-                    # If no historical data for this month, use overall average
-                    forecast_rows.at[i, 'simple_joins'] = round(forecast_df['new_joins'].mean())
-                    forecast_rows.at[i, 'simple_drops'] = round(forecast_df['new_drops'].mean())
+        # Generate joins and drops forecasts with each method, adding the columns in the
+        # order of FORECAST_METHODS whatever the order requested
+        for method in [method for method in FORECAST_METHODS if method in methods]:
+            joins, drops = FORECAST_METHODS[method](data_df, forecast_months, forecast_periods)
+            forecast_rows[f'{method}_joins'] = joins
+            forecast_rows[f'{method}_drops'] = drops
         
-        # Apply the ETS forecasting method if requested
-        if 'ets' in methods:
-            # Generate ETS forecasts
-            ets_joins, ets_drops = generate_ets_forecast(data_df, forecast_periods)
-            
-            # Add ETS forecasts to forecast rows
-            for i in range(len(forecast_rows)):
-                if i < len(ets_joins):
-                    forecast_rows.at[i, 'ets_joins'] = ets_joins[i]
-                if i < len(ets_drops):
-                    forecast_rows.at[i, 'ets_drops'] = ets_drops[i]
+        # Get the last actual active business count
+        last_actual_count = data_df['active_businesses'].iloc[-1]
         
         # Calculate net change and active businesses for each method
-        method_columns = {}
         for method in methods:
-            join_col = f'{method}_joins'
-            drop_col = f'{method}_drops'
+            net_col = f'{method}_net_change'
+            forecast_rows[net_col] = forecast_rows[f'{method}_joins'] - forecast_rows[f'{method}_drops']
             
-            if join_col in forecast_rows.columns and drop_col in forecast_rows.columns:
-                # Calculate net change
-                net_col = f'{method}_net_change'
-                forecast_rows[net_col] = forecast_rows[join_col] - forecast_rows[drop_col]
-                
-                # Get the last actual active business count
-                last_actual_count = forecast_df['active_businesses'].iloc[-1]
-                
-                # Calculate active businesses for each forecast period
-                active_col = f'{method}_active'
-                forecast_rows[active_col] = 0
-                prev_active = last_actual_count
-                
-                for i, row in forecast_rows.iterrows():
-                    current_active = prev_active + row[net_col]
-                    forecast_rows.at[i, active_col] = current_active
-                    prev_active = current_active
-                
-                # Store column names for this method
-                method_columns[method] = {
-                    'joins': join_col,
-                    'drops': drop_col,
-                    'net_change': net_col,
-                    'active': active_col
-                }
+            # Calculate active businesses for each forecast period as a running total
+            forecast_rows[f'{method}_active'] = last_actual_count + forecast_rows[net_col].to_numpy().cumsum()
         
         # For backward compatibility, copy the first method columns to the standard column names
         default_method = methods[0]
-        if default_method in method_columns:
-            cols = method_columns[default_method]
-            forecast_rows['new_joins'] = forecast_rows[cols['joins']]
-            forecast_rows['new_drops'] = forecast_rows[cols['drops']]
-            forecast_rows['net_change'] = forecast_rows[cols['net_change']]
-            forecast_rows['active_businesses'] = forecast_rows[cols['active']]
+        forecast_rows['new_joins'] = forecast_rows[f'{default_method}_joins']
+        forecast_rows['new_drops'] = forecast_rows[f'{default_method}_drops']
+        forecast_rows['net_change'] = forecast_rows[f'{default_method}_net_change']
+        forecast_rows['active_businesses'] = forecast_rows[f'{default_method}_active']
         
-        # Combine historical and forecast data
-        # First, mark historical data as not forecast
-        forecast_df['is_forecast'] = False
+        # Combine historical (marked as not forecast) and forecast data; the history is sorted by date
+        # and the forecast (if any periods were requested) starts the month after it, so the result
+        # is already in date order
+        assert forecast_rows.empty or data_df['year_month'].iloc[-1] < forecast_rows['year_month'].iloc[0]
+        combined_df = pd.concat([data_df.assign(is_forecast=False), forecast_rows], ignore_index=True)
         
-        # Combine and sort by date
-        combined_df = pd.concat([forecast_df, forecast_rows], ignore_index=True)
-        combined_df = combined_df.sort_values('year_month').reset_index(drop=True)
+        # Keep all count columns as 32-bit integers after combining
+        method_columns = [f'{method}_{kind}' for method in methods for kind in ('joins', 'drops', 'net_change', 'active')]
+        combined_df = downcast_counts(combined_df, COUNT_COLUMNS + ['net_change'] + method_columns)
         
-        logger.info(f"Forecast generated successfully for {forecast_periods} months using methods: {', '.join(methods)}")
+        logger.info("Forecast generated successfully for %s months using methods: %s", forecast_periods, ', '.join(methods))
         return combined_df
     except Exception as e:
-        logger.error(f"Error generating business forecast from summary: {e}")
+        logger.error("Error generating business forecast from summary: %s", e)
         raise
 
+def simple_forecast_kernel(months, joins, drops, forecast_months, recent_n=12):
+    """
+    Compute trend-adjusted seasonal averages for the simple forecasting method
+    
+    Works on raw arrays so it can be reused by other methods without pandas overhead.
+    
+    Parameters:
+    - months: Array of calendar months (1-12) for the historical periods
+    - joins: Array of historical join counts
+    - drops: Array of historical drop counts
+    - forecast_months: Array of calendar months (1-12) to forecast
+    - recent_n: Number of most recent periods used to calculate the trend factor
+    
+    Returns:
+    - Tuple of (join_forecast, drop_forecast) arrays for the forecast periods
+    """
+    months = np.asarray(months, dtype=np.int64)
+    forecast_months = np.asarray(forecast_months, dtype=np.int64)
+    history = np.vstack([joins, drops]).astype(np.float64)
+    
+    # Per-month sums and counts in a single scan over the history
+    counts = np.bincount(months, minlength=13)
+    sums = np.vstack([np.bincount(months, weights=series, minlength=13) for series in history])
+    
+    # Trend factors based on the most recent periods relative to the full history; the overall
+    # totals come from the per-month sums, so only the recent tail is scanned again
+    n = counts.sum()
+    all_means = sums.sum(axis=1) / n
+    recent_means = history[:, -recent_n:].sum(axis=1) / min(recent_n, n)
+    trend_factors = np.divide(recent_means, all_means, out=np.ones_like(all_means), where=all_means > 0)
+    
+    # Trend-adjusted monthly averages; months without history use the overall average
+    month_counts = counts[forecast_months]
+    has_history = month_counts > 0
+    month_means = sums[:, forecast_months] / np.where(has_history, month_counts, 1)
+    values = np.where(has_history, month_means * trend_factors[:, None], all_means[:, None])
+    
+    # Round to integers
+    values = np.rint(values).astype(np.int32)
+    return values[0], values[1]
+
+# Seasonal periods tried by the ETS grid search
+ETS_SEASONAL_PERIODS = [3, 4, 6, 12]
+
+def fit_ets_model(series):
+    """
+    Fit the best exponential smoothing model for a series with statsmodels
+    
+    Tries additive seasonality with each period in ETS_SEASONAL_PERIODS and keeps the model
+    with the lowest in-sample MSE, falling back to a damped trend model without seasonality.
+    
+    Parameters:
+    - series: Array of historical values
+    
+    Returns:
+    - Fitted statsmodels HoltWintersResults
+    """
+    from statsmodels.tsa.holtwinters import ExponentialSmoothing
+    
+    # Convert once so statsmodels doesn't copy/upcast the series for every fit
+    series = np.ascontiguousarray(series, dtype=np.float64)
+    n = len(series)
+    
+    best_model = None
+    best_mse = float('inf')
+    
+    # Try different seasonal periods (s)
+    for s in ETS_SEASONAL_PERIODS:
+        if n >= s * 2:  # Ensure enough data for estimation
+            try:
+                # Create model with additive seasonality and trend
+                model = ExponentialSmoothing(
+                    series,
+                    seasonal_periods=s,
+                    trend='add',
+                    seasonal='add',
+                    damped_trend=True  # Updated to use damped_trend instead of damped
+                ).fit(optimized=True)
+                
+                # In-sample MSE from the sum of squared errors computed during fitting
+                mse = model.sse / n
+                
+                # Update best model if this one is better
+                if mse < best_mse:
+                    best_mse = mse
+                    best_model = model
+            except:
+                # Skip if model fitting fails
+                continue
+    
+    # If no model was successfully fit, use simpler model
+    if best_model is None:
+        best_model = ExponentialSmoothing(
+            series,
+            trend='add',
+            seasonal=None,
+            damped_trend=True
+        ).fit(optimized=True)
+    
+    return best_model
+
+def ets_series_forecast(series, forecast_periods):
+    """
+    Forecast a series with exponential smoothing using the configured ETS_BACKEND
+    
+    With ETS_BACKEND set to 'statsforecast', AutoETS selects the model and seasonality itself;
+    if statsforecast isn't installed or fails, the statsmodels grid search is used instead.
+    
+    Parameters:
+    - series: Array of historical values
+    - forecast_periods: Number of periods (months) to forecast
+    
+    Returns:
+    - Array of forecast values
+    """
+    if ETS_BACKEND == 'statsforecast':
+        try:
+            from statsforecast.models import AutoETS
+            
+            model = AutoETS(season_length=12, model='ZZZ').fit(np.asarray(series, dtype=np.float64))
+            return model.predict(h=forecast_periods)['mean']
+        except Exception as e:
+            logger.warning("statsforecast AutoETS failed, using statsmodels instead: %s", e)
+    
+    # FIX: Remove .values since forecast() already returns a numpy array
+    return fit_ets_model(series).forecast(forecast_periods)
+
+@lru_cache(maxsize=32)
+def _cached_ets_series_forecast(series_bytes, forecast_periods):
+    """Forecast a float64 series given as bytes, memoized so unchanged series aren't refitted"""
+    forecast = np.asarray(ets_series_forecast(np.frombuffer(series_bytes, dtype=np.float64), forecast_periods))
+    forecast.setflags(write=False)
+    return forecast
+
+def cached_ets_series_forecast(series, forecast_periods):
+    """Same as ets_series_forecast, reusing the forecast when called again with identical values"""
+    series = np.ascontiguousarray(series, dtype=np.float64)
+    return _cached_ets_series_forecast(series.tobytes(), forecast_periods).copy()
+
 # Fix for the ETS forecasting function
 def generate_ets_forecast(data_df, forecast_periods=12):
     """
@@ -169,111 +255,15 @@ def generate_ets_forecast(data_df, forecast_periods=12):
     - Tuple of (join_forecast, drop_forecast) arrays for the forecast periods
     """
     try:
-        from statsmodels.tsa.holtwinters import ExponentialSmoothing
-        
         logger.info("Generating ETS forecast...")
         
-        # Prepare forecasts for joins and drops
-        join_forecast = []
-        drop_forecast = []
-        
-        # Train ETS model for joins
-        join_series = data_df['new_joins'].values
-        
-        # Find optimal parameters for joins
-        best_joins_model = None
-        best_joins_mse = float('inf')
-        
-        # Try different seasonal periods (s) for joins
-        for s in [3, 4, 6, 12]:
-            if len(join_series) >= s * 2:  # Ensure enough data for estimation
-                try:
-                    # Create model with additive seasonality and trend
-                    model = ExponentialSmoothing(
-                        join_series,
-                        seasonal_periods=s,
-                        trend='add',
-                        seasonal='add',
-                        damped_trend=True  # Updated to use damped_trend instead of damped
-                    ).fit(optimized=True)
-                    
-                    # Get in-sample predictions
-                    predictions = model.predict(start=0, end=len(join_series)-1)
-                    
-                    # Calculate MSE
-                    mse = np.mean((join_series - predictions)**2)
-                    
-                    # Update best model if this one is better
-                    if mse < best_joins_mse:
-                        best_joins_mse = mse
-                        best_joins_model = model
-                except:
-                    # Skip if model fitting fails
-                    continue
-        
-        # If no model was successfully fit, use simpler model
-        if best_joins_model is None:
-            best_joins_model = ExponentialSmoothing(
-                join_series,
-                trend='add',
-                seasonal=None,
-                damped_trend=True  # Updated to use damped_trend instead of damped
-            ).fit(optimized=True)
-        
-        # Generate forecasts for joins
-        # FIX: Remove .values since forecast() already returns a numpy array
-        join_forecast = best_joins_model.forecast(forecast_periods)
-        
-        # Train ETS model for drops
-        drop_series = data_df['new_drops'].values
-        
-        # Find optimal parameters for drops
-        best_drops_model = None
-        best_drops_mse = float('inf')
-        
-        # Try different seasonal periods (s) for drops
-        for s in [3, 4, 6, 12]:
-            if len(drop_series) >= s * 2:  # Ensure enough data for estimation
-                try:
-                    # Create model with additive seasonality and trend
-                    model = ExponentialSmoothing(
-                        drop_series,
-                        seasonal_periods=s,
-                        trend='add',
-                        seasonal='add',
-                        damped_trend=True  # Updated to use damped_trend instead of damped
-                    ).fit(optimized=True)
-                    
-                    # Get in-sample predictions
-                    predictions = model.predict(start=0, end=len(drop_series)-1)
-                    
-                    # Calculate MSE
-                    mse = np.mean((drop_series - predictions)**2)
-                    
-                    # Update best model if this one is better
-                    if mse < best_drops_mse:
-                        best_drops_mse = mse
-                        best_drops_model = model
-                except:
-                    # Skip if model fitting fails
-                    continue
-        
-        # If no model was successfully fit, use simpler model
-        if best_drops_model is None:
-            best_drops_model = ExponentialSmoothing(
-                drop_series,
-                trend='add',
-                seasonal=None,
-                damped_trend=True  # Updated to use damped_trend instead of damped
-            ).fit(optimized=True)
-        
-        # Generate forecasts for drops
-        # FIX: Remove .values since forecast() already returns a numpy array
-        drop_forecast = best_drops_model.forecast(forecast_periods)
+        # Fit separate models for joins and drops
+        join_forecast = cached_ets_series_forecast(data_df['new_joins'].to_numpy(), forecast_periods)
+        drop_forecast = cached_ets_series_forecast(data_df['new_drops'].to_numpy(), forecast_periods)
         
         # Round to integers
-        join_forecast = np.round(join_forecast).astype(int)
-        drop_forecast = np.round(drop_forecast).astype(int)
+        join_forecast = np.round(join_forecast).astype(np.int32)
+        drop_forecast = np.round(drop_forecast).astype(np.int32)
         
         # Ensure non-negative values
         join_forecast = np.maximum(join_forecast, 0)
@@ -283,7 +273,26 @@ def generate_ets_forecast(data_df, forecast_periods=12):
         
         return join_forecast, drop_forecast
     except Exception as e:
-        logger.error(f"Error generating ETS forecast: {str(e)}")
+        logger.error("Error generating ETS forecast: %s", e)
         import traceback
         logger.error(traceback.format_exc())
-        raise
\ No newline at end of file
+        raise
+
+def simple_forecast(data_df, forecast_months, forecast_periods):
+    """Simple method: trend-adjusted average of the same calendar month in the history"""
+    return simple_forecast_kernel(
+        data_df['month'].to_numpy(),
+        data_df['new_joins'].to_numpy(),
+        data_df['new_drops'].to_numpy(),
+        forecast_months
+    )
+
+def ets_forecast(data_df, forecast_months, forecast_periods):
+    """ETS method: exponential smoothing fitted separately to joins and drops"""
+    return generate_ets_forecast(data_df, forecast_periods)
+
+# Forecasting methods by name; each returns (join_forecast, drop_forecast) arrays
+FORECAST_METHODS = {
+    'simple': simple_forecast,
+    'ets': ets_forecast
+}
\ No newline at end of file
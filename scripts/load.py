@@ -3,45 +3,160 @@ import pandas as pd
 import os
 from datetime import datetime
 from scripts.logging_setup import logger
-from config import OUTPUT_DIR
+from scripts.transform import month_labels
+from config import OUTPUT_DIR, OUTPUT_FILE, OUTPUT_XLSX, SUMMARY_FILE, SUMMARY_XLSX, EMIT_XLSX
 
-def save_to_excel(df, filename, sheet_name='Forecast'):
+# Write strings as plain text: values starting with '=' or looking like URLs stay strings
+# and xlsxwriter skips checking every string for them
+XLSXWRITER_OPTIONS = {'strings_to_formulas': False, 'strings_to_urls': False}
+
+def excel_rows(df):
+    """
+    Yield the rows of a dataframe as lists of Excel-ready Python values
+    
+    Numpy scalars become Python ints, floats and bools, categories their values,
+    and missing values (NaN/NaT) become None so they are written as blank cells.
+    """
+    values = df.astype(object).where(df.notna(), None)
+    for row in values.itertuples(index=False, name=None):
+        yield list(row)
+
+def write_rows_xlsxwriter(df, file_path, sheet_name):
+    """Write a dataframe row by row with xlsxwriter in constant_memory mode"""
+    import xlsxwriter
+    
+    # constant_memory only allows writing row by row, so cells are written here rather
+    # than with DataFrame.to_excel (which writes column by column). It also rules out merged
+    # cells spanning rows, which neither output uses.
+    options = dict(XLSXWRITER_OPTIONS, constant_memory=True, default_date_format='yyyy-mm-dd hh:mm:ss')
+    with xlsxwriter.Workbook(file_path, options) as workbook:
+        worksheet = workbook.add_worksheet(sheet_name)
+        worksheet.write_row(0, 0, [str(col) for col in df.columns])
+        for row_idx, row in enumerate(excel_rows(df), start=1):
+            worksheet.write_row(row_idx, 0, row)
+
+def write_rows_openpyxl(df, file_path, sheet_name):
+    """Write a dataframe row by row to an openpyxl write-only workbook"""
+    from openpyxl import Workbook
+    
+    workbook = Workbook(write_only=True)
+    worksheet = workbook.create_sheet(sheet_name)
+    worksheet.append([str(col) for col in df.columns])
+    for row in excel_rows(df):
+        worksheet.append(row)
+    workbook.save(file_path)
+
+def save_to_excel(df, filename, sheet_name='Forecast', streaming=True, engine='xlsxwriter'):
     """
     Save a dataframe to an Excel file
+    
+    Parameters:
+    - df: DataFrame to save
+    - filename: Name of the file in the output directory
+    - sheet_name: Name of the worksheet
+    - streaming: Write one row at a time so only the current row is held in memory, with
+      xlsxwriter or, if it isn't installed, an openpyxl write-only workbook. Otherwise the
+      whole workbook is built with DataFrame.to_excel.
+    - engine: pandas Excel engine used when not streaming
+    
+    Returns:
+    - File path of saved Excel file
     """
     try:
         file_path = os.path.join(OUTPUT_DIR, filename)
-        logger.info(f"Saving data to: {file_path}")
+        logger.info("Saving data to: %s", file_path)
         
-        with pd.ExcelWriter(file_path, engine='openpyxl') as writer:
-            df.to_excel(writer, sheet_name=sheet_name, index=False)
+        if not streaming:
+            engine_kwargs = {'options': XLSXWRITER_OPTIONS} if engine == 'xlsxwriter' else None
+            with pd.ExcelWriter(file_path, engine=engine, engine_kwargs=engine_kwargs) as writer:
+                df.to_excel(writer, sheet_name=sheet_name, index=False)
+        else:
+            try:
+                write_rows_xlsxwriter(df, file_path, sheet_name)
+            except ImportError:
+                logger.info("xlsxwriter is not installed, writing %s with openpyxl", filename)
+                write_rows_openpyxl(df, file_path, sheet_name)
             
-        logger.info(f"Successfully saved {len(df)} rows to {filename}")
+        logger.info("Successfully saved %s rows to %s", len(df), filename)
         return file_path
     except Exception as e:
-        logger.error(f"Error saving to Excel: {e}")
+        logger.error("Error saving to Excel: %s", e)
         raise
 
-def save_forecast_data(forecast_df, timestamp=None):
+def save_to_excel_fast(df, filename, sheet_name='Forecast'):
     """
-    Save forecast data to Excel with fixed filename
+    Save the values of a dataframe (no styles) to an Excel file with pyexcelerate
+    
+    pyexcelerate is an optional dependency; without it the file is written with save_to_excel.
+    
+    Returns:
+    - File path of saved Excel file
+    """
+    try:
+        from pyexcelerate import Workbook
+    except ImportError:
+        return save_to_excel(df, filename, sheet_name)
+    
+    try:
+        file_path = os.path.join(OUTPUT_DIR, filename)
+        logger.info("Saving data to: %s", file_path)
+        
+        workbook = Workbook()
+        workbook.new_sheet(sheet_name, data=[[str(col) for col in df.columns]] + list(excel_rows(df)))
+        workbook.save(file_path)
+        
+        logger.info("Successfully saved %s rows to %s", len(df), filename)
+        return file_path
+    except Exception as e:
+        logger.error("Error saving to Excel: %s", e)
+        raise
+
+def save_to_parquet(df, file_path):
+    """
+    Save a dataframe with its typed columns to a zstd-compressed Parquet file
+    
+    Returns:
+    - File path of saved Parquet file
+    """
+    try:
+        logger.info("Saving data to: %s", file_path)
+        df.to_parquet(file_path, engine='pyarrow', compression='zstd', index=False)
+        logger.info("Successfully saved %s rows to %s", len(df), file_path.name)
+        return str(file_path)
+    except Exception as e:
+        logger.error("Error saving to Parquet: %s", e)
+        raise
+
+def save_forecast_parquet(forecast_df):
+    """Save forecast data as is (no date labels or column reordering) to the Parquet output file"""
+    return save_to_parquet(forecast_df, OUTPUT_FILE)
+
+def save_summary_parquet(summary_df):
+    """Save the monthly business summary as is to its Parquet output file"""
+    return save_to_parquet(summary_df, SUMMARY_FILE)
+
+def save_forecast_data(forecast_df, timestamp=None, export_xlsx=EMIT_XLSX):
+    """
+    Save forecast data to Parquet, plus an Excel copy unless export_xlsx is disabled
     
     Parameters:
     - forecast_df: DataFrame containing forecast data
     - timestamp: Optional timestamp (not used, kept for compatibility)
+    - export_xlsx: Also write the Excel copy (defaults to the EMIT_XLSX setting)
     
     Returns:
-    - File path of saved Excel file
+    - File path of saved Parquet file, or (Parquet path, Excel path) when the Excel copy is written
     """
     try:
-        # Use a fixed filename without timestamp
-        filename = "business_forecast.xlsx"
+        # Save the typed forecast data as the primary output
+        parquet_path = save_forecast_parquet(forecast_df)
         
-        # Format the DataFrame for Excel
-        excel_df = forecast_df.copy()
+        if not export_xlsx:
+            return parquet_path
         
-        # Add formatted date column
-        excel_df['date'] = excel_df['year_month'].dt.strftime('%b %Y')
+        # Format the DataFrame for Excel with an added formatted date column
+        # (assign leaves the input untouched without copying it first)
+        excel_df = forecast_df.assign(date=month_labels(forecast_df['year_month']))
         
         # Ensure is_forecast column exists
         if 'is_forecast' not in excel_df.columns:
@@ -63,26 +178,30 @@ def save_forecast_data(forecast_df, timestamp=None):
         excel_df = excel_df[available_columns]
         
         # Save to Excel
-        file_path = save_to_excel(excel_df, filename, 'Forecast')
+        xlsx_path = save_to_excel_fast(excel_df, OUTPUT_XLSX.name, 'Forecast')
         
-        return file_path
+        return parquet_path, xlsx_path
     except Exception as e:
-        logger.error(f"Error saving forecast data: {e}")
+        logger.error("Error saving forecast data: %s", e)
         raise
 
-def save_monthly_summary(summary_df, timestamp=None):
+def save_monthly_summary(summary_df, timestamp=None, export_xlsx=EMIT_XLSX):
     """
-    Save monthly business summary to Excel with fixed filename
+    Save monthly business summary to Parquet, plus an Excel copy with fixed filename
+    unless export_xlsx is disabled (defaults to the EMIT_XLSX setting)
+    
+    Returns:
+    - File path of saved Parquet file, or (Parquet path, Excel path) when the Excel copy is written
     """
     try:
-        # Use a fixed filename without timestamp
-        filename = "business_monthly_summary.xlsx"
+        parquet_path = save_summary_parquet(summary_df)
         
-        # Format the DataFrame for Excel
-        excel_df = summary_df.copy()
+        if not export_xlsx:
+            return parquet_path
         
-        # Add formatted date column
-        excel_df['date'] = excel_df['year_month'].dt.strftime('%b %Y')
+        # Format the DataFrame for Excel with an added formatted date column
+        # (assign leaves the input untouched without copying it first)
+        excel_df = summary_df.assign(date=month_labels(summary_df['year_month']))
         
         # Reorder columns for better readability
         column_order = [
@@ -98,9 +217,9 @@ def save_monthly_summary(summary_df, timestamp=None):
         excel_df = excel_df[column_order]
         
         # Save to Excel
-        file_path = save_to_excel(excel_df, filename, 'Monthly Summary')
+        xlsx_path = save_to_excel_fast(excel_df, SUMMARY_XLSX.name, 'Monthly Summary')
         
-        return file_path
+        return parquet_path, xlsx_path
     except Exception as e:
-        logger.error(f"Error saving monthly summary: {e}")
+        logger.error("Error saving monthly summary: %s", e)
         raise
\ No newline at end of file
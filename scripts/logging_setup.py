@@ -1,11 +1,20 @@
 # scripts/logging_setup.py
 import logging
+import logging.handlers
+import atexit
+import queue
 from datetime import datetime
 import sys
+import pandas as pd
 from config import LOG_FILE
 
 def setup_logging():
-    """Configure logging to both file and console"""
+    """
+    Configure logging to both file and console
+    
+    File writes happen on a background QueueListener thread so logging calls only enqueue
+    the record; the listener is stopped (flushing pending records) at exit.
+    """
     
     # Create logger
     logger = logging.getLogger("python-forecasting")
@@ -13,22 +22,34 @@ def setup_logging():
     
     # Create formatters
     file_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-    console_formatter = logging.Formatter('%(levelname)s: %(message)s')
+    console_formatter = logging.Formatter('%(asctime)s %(levelname)s %(message)s')
     
-    # File handler
+    # File handler, owned by the listener thread
     file_handler = logging.FileHandler(LOG_FILE)
     file_handler.setLevel(logging.INFO)
     file_handler.setFormatter(file_formatter)
     
-    # Console handler
+    log_queue = queue.Queue(-1)
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    listener = logging.handlers.QueueListener(log_queue, file_handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    
+    # Console handler (also the run's progress output, so it stays synchronous and in order
+    # with printed checkpoints; StreamHandler flushes after each record)
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setLevel(logging.INFO)
     console_handler.setFormatter(console_formatter)
     
     # Add handlers to logger
-    logger.addHandler(file_handler)
+    logger.addHandler(queue_handler)
     logger.addHandler(console_handler)
     
     return logger
 
-logger = setup_logging()
\ No newline at end of file
+logger = setup_logging()
+
+# Copy-on-write lets dataframes derived in the pipeline share data instead of being copied defensively.
+# It is always enabled from pandas 3.0, where setting the option is deprecated.
+if int(pd.__version__.split('.')[0]) < 3:
+    pd.set_option('mode.copy_on_write', True)
\ No newline at end of file
@@ -0,0 +1,214 @@
+# scripts/pipeline.py
+import os
+import sys
+import traceback
+import pandas as pd
+from dataclasses import dataclass
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from scripts.extract import extract_business, extract_business_fingerprint, extract_monthly_business_counts
+from scripts.transform import (
+    clean_business_data,
+    create_monthly_business_summary,
+    create_monthly_summary_from_counts,
+    correct_known_data_issues,
+    reset_run_clock,
+    monthly_date_range
+)
+from scripts.forecast import generate_business_forecast_from_summary
+from scripts.load import save_forecast_data, save_monthly_summary
+from scripts.cache import cached_stage
+from scripts.logging_setup import logger
+
+@dataclass
+class RunConfig:
+    """Options for one run of the forecasting pipeline"""
+    start_year: int = 2000
+    forecast_periods: int = 12              # Forecast for 1 year
+    lookback_years: int = 5                 # Use 5 years of data
+    methods: tuple = ('simple', 'ets')      # Use both simple and ETS methods
+    emit_monthly: bool = True               # Save the monthly summary
+    use_corrections: bool = True            # Apply corrections to known data issues
+    diagnostic: bool = False                # Run step by step on per-row data, printing each result
+
+    @classmethod
+    def from_env(cls):
+        """Build a RunConfig from FORECAST_* environment variables, using the defaults for unset ones"""
+        return cls(
+            emit_monthly=os.getenv("FORECAST_EMIT_MONTHLY", "1") == "1",
+            use_corrections=os.getenv("FORECAST_USE_CORRECTIONS", "1") == "1",
+            diagnostic=os.getenv("FORECAST_DIAGNOSTIC", "0") == "1"
+        )
+
+class StageError(Exception):
+    """Raised when a pipeline stage fails in diagnostic mode (details are already logged)"""
+
+def print_checkpoint(message):
+    print(f"CHECKPOINT: {message}")
+
+# Stages are (name, result key, function of (cfg, ctx)), optionally followed by the preview of a
+# DataFrame result printed in diagnostic mode: numbers of first ("head") and last ("tail") rows
+# and whether to print the column "dtypes" (DEFAULT_PREVIEW if not given). A list of branches
+# runs concurrently outside diagnostic mode, each branch being a stage or a list of stages run
+# in order. Each result is stored in ctx under its key for the following stages; ctx starts
+# with the month_grid of the run, shared by the stages that build monthly data.
+DEFAULT_PREVIEW = {"head": 5}
+
+ROW_SUMMARY_STAGES = [
+    ("Extracting data", "raw_data",
+        lambda cfg, ctx: extract_business(),
+        {"head": 5, "dtypes": True}),
+    ("Cleaning data", "clean_data",
+        lambda cfg, ctx: clean_business_data(ctx["raw_data"])),
+    ("Creating monthly business summary", "monthly_summary",
+        lambda cfg, ctx: create_monthly_business_summary(ctx["clean_data"], start_year=cfg.start_year, month_grid=ctx["month_grid"]),
+        {"head": 5, "tail": 5}),
+]
+
+# Monthly counts are aggregated in the database, per-row data isn't needed here
+COUNTS_SUMMARY_STAGES = [
+    ("Extracting data", "monthly_counts",
+        lambda cfg, ctx: extract_monthly_business_counts()),
+    ("Creating monthly business summary", "monthly_summary",
+        lambda cfg, ctx: create_monthly_summary_from_counts(ctx["monthly_counts"], start_year=cfg.start_year, month_grid=ctx["month_grid"])),
+]
+
+def load_cached_summary(cfg, ctx):
+    """
+    Reuse the cached monthly summary unless the Business table fingerprint (see
+    extract_business_fingerprint) or the month covered by the run changed
+    """
+    # The month comes from the run's month grid, the one the summary is built on,
+    # so a run crossing a month boundary caches its summary under the month it covers
+    cache_key = f"{extract_business_fingerprint()}|{cfg.start_year}|{ctx['month_grid'][-1].strftime('%Y-%m')}"
+    return cached_stage(
+        "monthly_summary", cache_key,
+        lambda: run_stages(cfg, COUNTS_SUMMARY_STAGES, {"month_grid": ctx["month_grid"]})["monthly_summary"]
+    )
+
+def build_stages(cfg):
+    """List the stages of a run for cfg"""
+    if cfg.diagnostic:
+        stages = list(ROW_SUMMARY_STAGES)
+    else:
+        stages = [("Loading monthly summary", "monthly_summary", load_cached_summary)]
+
+    if cfg.use_corrections:
+        stages.append(("Applying corrections to known data issues", "monthly_summary",
+            lambda cfg, ctx: correct_known_data_issues(ctx["monthly_summary"])))
+
+    forecast_branch = [
+        ("Generating forecast from monthly summary", "forecast_data",
+            lambda cfg, ctx: generate_business_forecast_from_summary(
+                ctx["monthly_summary"],
+                forecast_periods=cfg.forecast_periods,
+                lookback_years=cfg.lookback_years,
+                methods=list(cfg.methods)
+            ),
+            {"tail": 15}),
+        ("Saving forecast data", "forecast_file",
+            lambda cfg, ctx: save_forecast_data(ctx["forecast_data"])),
+    ]
+
+    # Saving the monthly summary doesn't feed the forecast, so it runs while the forecast
+    # is generated and saved
+    if cfg.emit_monthly:
+        stages.append([
+            ("Saving monthly summary", "summary_file",
+                lambda cfg, ctx: save_monthly_summary(ctx["monthly_summary"])),
+            forecast_branch
+        ])
+    else:
+        stages.extend(forecast_branch)
+    return stages
+
+def run_stage(cfg, stage, ctx):
+    """Run a single stage, reporting its result in diagnostic mode"""
+    name, key, stage_fn = stage[:3]
+    preview = stage[3] if len(stage) > 3 else DEFAULT_PREVIEW
+    if cfg.diagnostic:
+        print_checkpoint(name)
+    logger.info("%s...", name)
+
+    try:
+        result = stage_fn(cfg, ctx)
+    except Exception:
+        if not cfg.diagnostic:
+            raise
+        logger.exception("Error in %s", name)
+        raise StageError(name)
+
+    if isinstance(result, pd.DataFrame):
+        logger.info("%s completed. Shape: %s", name, result.shape)
+        if cfg.diagnostic:
+            print_checkpoint(f"{name} completed successfully. Shape: {result.shape}")
+            if preview.get("head"):
+                print(f"First {preview['head']} rows of {key}:\n{result.head(preview['head'])}")
+            if preview.get("tail"):
+                print(f"Last {preview['tail']} rows of {key}:\n{result.tail(preview['tail'])}")
+            if preview.get("dtypes"):
+                print(f"Data types: {result.dtypes}")
+            if result.empty:
+                print(f"WARNING: {key} is empty!")
+            elif len(result) < 10:
+                print(f"WARNING: Very few rows in {key}!")
+    else:
+        logger.info("%s completed: %s", name, result)
+        if cfg.diagnostic:
+            print_checkpoint(f"{name} completed successfully: {result}")
+    return result
+
+def run_branches(cfg, branches, ctx):
+    """Run branches (a stage or a list of stages run in order) at the same time"""
+    def run_branch(branch):
+        run_stages(cfg, branch if isinstance(branch, list) else [branch], ctx)
+
+    if cfg.diagnostic:
+        # Diagnostic runs go one step at a time so failures are easy to locate
+        for branch in branches:
+            run_branch(branch)
+        return
+
+    with ThreadPoolExecutor(max_workers=len(branches)) as executor:
+        futures = [executor.submit(run_branch, branch) for branch in branches]
+        for future in futures:
+            future.result()
+
+def run_stages(cfg, stages, ctx):
+    """Run stages in order, storing each result in ctx; returns ctx"""
+    for stage in stages:
+        if isinstance(stage, list):
+            run_branches(cfg, stage, ctx)
+        else:
+            ctx[stage[1]] = run_stage(cfg, stage, ctx)
+    return ctx
+
+def run(cfg):
+    """Execute the forecasting process described by cfg"""
+    # Flush console output at every line so progress is displayed immediately
+    if hasattr(sys.stdout, 'reconfigure'):
+        sys.stdout.reconfigure(line_buffering=True)
+
+    try:
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        if cfg.diagnostic:
+            print_checkpoint(f"Starting diagnostic forecast process at {timestamp}")
+        logger.info("Starting forecast process at %s", timestamp)
+
+        # Take the current time afresh, a previous run in the same process may be from another month
+        reset_run_clock()
+        run_stages(cfg, build_stages(cfg), {"month_grid": monthly_date_range(cfg.start_year)})
+
+        if cfg.diagnostic:
+            print_checkpoint("All steps completed successfully!")
+        logger.info("Forecast process completed successfully")
+    except StageError:
+        # Diagnostic runs stop at the first failing stage; the error has already been logged
+        return
+    except Exception as e:
+        if cfg.diagnostic:
+            print(f"ERROR: {str(e)}")
+            print(traceback.format_exc())
+        logger.error("Error in forecast process: %s", e)
+        logger.error(traceback.format_exc())
+        raise
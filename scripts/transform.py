@@ -2,8 +2,107 @@
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
+from functools import lru_cache
 from scripts.logging_setup import logger
 
+# Public interface of the module; every function is defined once, here
+__all__ = [
+    'MONTH_NAMES', 'MONTH_CATEGORIES', 'SEASON_CATEGORIES', 'COUNT_COLUMNS', 'KNOWN_DROP_CORRECTIONS',
+    'downcast_counts', 'reset_run_clock', 'monthly_date_range', 'month_labels',
+    'clean_business_data', 'filter_data_by_date_range', 'aggregate_monthly_data',
+    'create_time_series_df', 'add_date_features',
+    'create_monthly_business_summary', 'create_monthly_summary_from_counts',
+    'prepare_summary_for_forecast', 'correct_known_data_issues'
+]
+
+# Month abbreviations in calendar order, as produced by strftime('%b'), indexed by month - 1
+MONTH_NAMES = np.array(['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec'], dtype=object)
+
+# Month names and seasons are stored as categoricals (int8 codes plus the shared names)
+MONTH_CATEGORIES = pd.CategoricalDtype(MONTH_NAMES, ordered=True)
+
+# Northern Hemisphere seasons; the season code of a month is (month % 12) // 3
+SEASON_CATEGORIES = pd.CategoricalDtype(['Winter', 'Spring', 'Summer', 'Fall'])
+
+# Monthly summary columns holding counts of businesses
+COUNT_COLUMNS = ['active_businesses', 'new_joins', 'new_drops']
+
+# Correct new_drops for months with known data issues, keyed by (year, month)
+KNOWN_DROP_CORRECTIONS = {
+    (2025, 1): 134,
+    (2025, 2): 136,
+}
+
+def downcast_counts(df, columns=COUNT_COLUMNS):
+    """
+    Store count columns as int32 - the counts are far below 2**31 and half the bytes of int64
+    
+    Columns with missing values (e.g. forecast-only columns on historical rows) use the
+    nullable Int32 dtype instead of falling back to float64.
+    """
+    for col in columns:
+        if col in df.columns:
+            df[col] = df[col].astype('Int32' if df[col].hasnans else np.int32)
+    return df
+
+@lru_cache(maxsize=1)
+def _run_now():
+    """
+    Current time, fixed at the first call so all steps of a run agree on the current month
+    (until reset_run_clock is called at the start of the next run)
+    """
+    return pd.Timestamp(datetime.now())
+
+@lru_cache(maxsize=1)
+def _current_month_start():
+    """First day of the current month"""
+    now = _run_now()
+    return pd.Timestamp(year=now.year, month=now.month, day=1)
+
+@lru_cache(maxsize=8)
+def _lookback_cutoff(lookback_years):
+    """Start of the lookback period ending now"""
+    return _run_now() - pd.DateOffset(years=lookback_years)
+
+def reset_run_clock():
+    """Start a new run: the current time and the dates derived from it are taken again when next used"""
+    _run_now.cache_clear()
+    _current_month_start.cache_clear()
+    _lookback_cutoff.cache_clear()
+
+def monthly_date_range(start_year):
+    """
+    Month starts from January of start_year to the current month, the grid of the monthly summary
+    
+    Build it once per run and pass it as month_grid to the summary functions so they share it.
+    """
+    return pd.date_range(start=pd.Timestamp(year=start_year, month=1, day=1), end=_current_month_start(), freq='MS')
+
+def _ensure_dt(series):
+    """Convert a series to datetime unless it already is (e.g. parsed by read_sql)"""
+    return series if pd.api.types.is_datetime64_any_dtype(series) else pd.to_datetime(series)
+
+def _month_keys(dates):
+    """Integer month keys (year * 12 + month - 1) of a datetime series without missing values"""
+    return dates.dt.year.to_numpy(dtype=np.int64) * 12 + dates.dt.month.to_numpy(dtype=np.int64) - 1
+
+def _month_key_starts(keys):
+    """First day of the month of each month key"""
+    keys = np.asarray(keys)
+    return pd.DatetimeIndex(pd.to_datetime({'year': keys // 12, 'month': keys % 12 + 1, 'day': 1}))
+
+def month_labels(year_month):
+    """'Mon YYYY' labels for a datetime series, the same as .dt.strftime('%b %Y') without per-value formatting"""
+    return MONTH_NAMES[year_month.dt.month.to_numpy() - 1] + ' ' + year_month.dt.year.to_numpy().astype(str).astype(object)
+
+def _add_month_columns(summary_df):
+    """Add year, month and month_name columns from year_month, decomposing the dates once"""
+    months = summary_df['year_month'].dt.month.to_numpy()
+    summary_df['year'] = summary_df['year_month'].dt.year.to_numpy()
+    summary_df['month'] = months.astype(np.int8)
+    summary_df['month_name'] = pd.Categorical.from_codes(months - 1, dtype=MONTH_CATEGORIES)
+    return summary_df
+
 def clean_business_data(df):
     """Clean the business data by removing rows without join dates"""
     try:
@@ -14,12 +113,12 @@ def clean_business_data(df):
         cleaned_count = len(cleaned_df)
         removed_count = original_count - cleaned_count
         
-        logger.info(f"Cleaned business data: removed {removed_count} rows without join dates")
-        logger.info(f"Remaining records: {cleaned_count}")
+        logger.info("Cleaned business data: removed %s rows without join dates", removed_count)
+        logger.info("Remaining records: %s", cleaned_count)
         
         return cleaned_df
     except Exception as e:
-        logger.error(f"Error cleaning business data: {e}")
+        logger.error("Error cleaning business data: %s", e)
         raise
 
 def filter_data_by_date_range(df, lookback_years=5):
@@ -27,21 +126,20 @@ def filter_data_by_date_range(df, lookback_years=5):
     Filter data to only include records within the specified lookback period
     """
     try:
-        today = pd.to_datetime(datetime.now())
-        cutoff_date = today - pd.DateOffset(years=lookback_years)
+        cutoff_date = _lookback_cutoff(lookback_years)
         
         # Convert dates to datetime if they aren't already
-        df['date_accredited'] = pd.to_datetime(df['date_accredited'])
+        df['date_accredited'] = _ensure_dt(df['date_accredited'])
         
         # Filter to recent data only
         filtered_df = df[df['date_accredited'] >= cutoff_date]
         
-        logger.info(f"Filtered to data from the past {lookback_years} years")
-        logger.info(f"Original record count: {len(df)}, Filtered record count: {len(filtered_df)}")
+        logger.info("Filtered to data from the past %s years", lookback_years)
+        logger.info("Original record count: %s, Filtered record count: %s", len(df), len(filtered_df))
         
         return filtered_df
     except Exception as e:
-        logger.error(f"Error filtering data by date range: {e}")
+        logger.error("Error filtering data by date range: %s", e)
         raise
 
 def aggregate_monthly_data(df):
@@ -51,52 +149,59 @@ def aggregate_monthly_data(df):
     """
     try:
         # Convert dates to datetime if they aren't already
-        df['date_accredited'] = pd.to_datetime(df['date_accredited'])
+        df['date_accredited'] = _ensure_dt(df['date_accredited'])
         if 'date_dropped' in df.columns:
-            df['date_dropped'] = pd.to_datetime(df['date_dropped'])
+            df['date_dropped'] = _ensure_dt(df['date_dropped'])
         
-        # Create monthly join counts
-        df_joins = df.copy()
-        df_joins['year_month'] = df_joins['date_accredited'].dt.to_period('M')
-        monthly_joins = df_joins.groupby('year_month').size().reset_index(name='join_count')
-        monthly_joins['year_month'] = monthly_joins['year_month'].dt.to_timestamp()
+        # Stack join and drop dates (excluding NaN drop dates) as events and count both kinds per month
+        # in a single groupby
+        events = pd.concat([
+            pd.DataFrame({'month_key': _month_keys(df['date_accredited'].dropna()), 'kind': 'join_count'}),
+            pd.DataFrame({'month_key': _month_keys(df['date_dropped'].dropna()), 'kind': 'drop_count'})
+        ], ignore_index=True)
+        monthly_counts = events.groupby(['month_key', 'kind']).size().unstack(fill_value=0)
+        monthly_counts = monthly_counts.reindex(columns=['join_count', 'drop_count'], fill_value=0).rename_axis(columns=None)
+        monthly_counts.index = _month_key_starts(monthly_counts.index).rename('year_month')
         
-        # Create monthly drop counts (exclude NaN drop dates)
-        df_drops = df.dropna(subset=['date_dropped']).copy()
-        df_drops['year_month'] = df_drops['date_dropped'].dt.to_period('M')
-        monthly_drops = df_drops.groupby('year_month').size().reset_index(name='drop_count')
-        monthly_drops['year_month'] = monthly_drops['year_month'].dt.to_timestamp()
+        # Split into monthly join and drop counts, keeping only months with at least one event
+        monthly_joins = monthly_counts.loc[monthly_counts['join_count'] > 0, ['join_count']].reset_index()
+        monthly_drops = monthly_counts.loc[monthly_counts['drop_count'] > 0, ['drop_count']].reset_index()
         
-        logger.info(f"Created monthly aggregates: {len(monthly_joins)} months of join data")
-        logger.info(f"Created monthly aggregates: {len(monthly_drops)} months of drop data")
+        logger.info("Created monthly aggregates: %s months of join data", len(monthly_joins))
+        logger.info("Created monthly aggregates: %s months of drop data", len(monthly_drops))
         
         return monthly_joins, monthly_drops
     except Exception as e:
-        logger.error(f"Error aggregating monthly data: {e}")
+        logger.error("Error aggregating monthly data: %s", e)
         raise
 
-def create_time_series_df(monthly_joins, monthly_drops, start_date=None, end_date=None):
+def create_time_series_df(monthly_joins, monthly_drops, start_date=None, end_date=None, month_grid=None):
     """
     Create a complete time series dataframe with joins and drops
     Fill in missing months with zeros
+    
+    A month_grid (see monthly_date_range) is used as the months of the series as given,
+    instead of building the range from start_date/end_date.
     """
     try:
-        # If no date range specified, use min and max dates from the data
-        if start_date is None:
-            join_min = monthly_joins['year_month'].min()
-            drop_min = monthly_drops['year_month'].min() if not monthly_drops.empty else pd.NaT
-            dates = [join_min, drop_min]
-            start_date = min(d for d in dates if not pd.isna(d))
-        
-        if end_date is None:
-            join_max = monthly_joins['year_month'].max() 
-            drop_max = monthly_drops['year_month'].max() if not monthly_drops.empty else pd.NaT
-            dates = [join_max, drop_max]
-            end_date = max(d for d in dates if not pd.isna(d))
-        
-        # Create a complete date range at month level
-        date_range = pd.date_range(start=start_date, end=end_date, freq='MS')
-        time_series_df = pd.DataFrame({'year_month': date_range})
+        if month_grid is None:
+            # If no date range specified, use min and max dates from the data
+            if start_date is None:
+                join_min = monthly_joins['year_month'].min()
+                drop_min = monthly_drops['year_month'].min() if not monthly_drops.empty else pd.NaT
+                dates = [join_min, drop_min]
+                start_date = min(d for d in dates if not pd.isna(d))
+            
+            if end_date is None:
+                join_max = monthly_joins['year_month'].max() 
+                drop_max = monthly_drops['year_month'].max() if not monthly_drops.empty else pd.NaT
+                dates = [join_max, drop_max]
+                end_date = max(d for d in dates if not pd.isna(d))
+            
+            # Create a complete date range at month level
+            month_grid = pd.date_range(start=start_date, end=end_date, freq='MS')
+        
+        time_series_df = pd.DataFrame({'year_month': month_grid})
         
         # Merge join counts
         time_series_df = pd.merge(
@@ -111,19 +216,19 @@ def create_time_series_df(monthly_joins, monthly_drops, start_date=None, end_dat
         )
         
         # Fill NaN values with 0
-        time_series_df['join_count'] = time_series_df['join_count'].fillna(0).astype(int)
-        time_series_df['drop_count'] = time_series_df['drop_count'].fillna(0).astype(int)
+        time_series_df['join_count'] = time_series_df['join_count'].fillna(0).astype(np.int32)
+        time_series_df['drop_count'] = time_series_df['drop_count'].fillna(0).astype(np.int32)
         
         # Add net change column
         time_series_df['net_change'] = time_series_df['join_count'] - time_series_df['drop_count']
         
         # Calculate cumulative totals (running business count)
-        time_series_df['cumulative_total'] = time_series_df['net_change'].cumsum()
+        time_series_df['cumulative_total'] = np.cumsum(time_series_df['net_change'].to_numpy(), dtype=np.int32)
         
-        logger.info(f"Created complete time series dataframe with {len(time_series_df)} months")
+        logger.info("Created complete time series dataframe with %s months", len(time_series_df))
         return time_series_df
     except Exception as e:
-        logger.error(f"Error creating time series dataframe: {e}")
+        logger.error("Error creating time series dataframe: %s", e)
         raise
 
 def add_date_features(df):
@@ -132,107 +237,71 @@ def add_date_features(df):
     """
     try:
         # Add month and year columns
-        df['month'] = df['year_month'].dt.month
-        df['year'] = df['year_month'].dt.year
+        months = df['year_month'].dt.month.to_numpy()
+        df['month'] = months
+        df['year'] = df['year_month'].dt.year.to_numpy()
         
         # Add quarter
-        df['quarter'] = df['year_month'].dt.quarter
+        df['quarter'] = ((months - 1) // 3 + 1).astype(np.int8)
         
         # Add season (Northern Hemisphere)
-        season_map = {
-            1: 'Winter', 2: 'Winter', 3: 'Spring', 
-            4: 'Spring', 5: 'Spring', 6: 'Summer',
-            7: 'Summer', 8: 'Summer', 9: 'Fall', 
-            10: 'Fall', 11: 'Fall', 12: 'Winter'
-        }
-        df['season'] = df['month'].map(season_map)
+        df['season'] = pd.Categorical.from_codes((months % 12) // 3, dtype=SEASON_CATEGORIES)
         
         logger.info("Added date features to time series dataframe")
         return df
     except Exception as e:
-        logger.error(f"Error adding date features: {e}")
+        logger.error("Error adding date features: %s", e)
         raise
     
-def create_monthly_business_summary(df, start_year=2010):
+def create_monthly_business_summary(df, start_year=2010, month_grid=None):
     """
     Create a monthly summary of business data from start_year to current month
     - Count of active businesses at start of month
     - Count of new businesses that joined in the month
     - Count of businesses that dropped in the month
     
+    A prebuilt month_grid (see monthly_date_range) is used instead of building the range again.
+    
     Returns a dataframe with these metrics for each month
     """
     try:
-        # Ensure dates are in datetime format
-        df = df.copy()  # Create a copy to avoid SettingWithCopyWarning
-        df['date_accredited'] = pd.to_datetime(df['date_accredited'])
-        if 'date_dropped' in df.columns:
-            df['date_dropped'] = pd.to_datetime(df['date_dropped'])
+        # Ensure dates are in datetime format (as local series, the input dataframe isn't modified)
+        accredited = _ensure_dt(df['date_accredited'])
+        dropped = _ensure_dt(df['date_dropped'])
         
-        # Get current date and create date range
-        current_date = datetime.now()
-        # Go to first day of current month
-        current_month_start = pd.Timestamp(year=current_date.year, month=current_date.month, day=1)
         # Create date range from start_year to current month
-        start_date = pd.Timestamp(year=start_year, month=1, day=1)
-        date_range = pd.date_range(start=start_date, end=current_month_start, freq='MS')
+        date_range = monthly_date_range(start_year) if month_grid is None else month_grid
         
         # Create empty dataframe to hold the summary
         summary_df = pd.DataFrame({'year_month': date_range})
         
-        # Initialize columns
-        summary_df['active_businesses'] = 0
-        summary_df['new_joins'] = 0
-        summary_df['new_drops'] = 0
-        
-        # Get monthly joins
-        joins_df = df.copy()
-        joins_df['join_month'] = joins_df['date_accredited'].dt.to_period('M')
-        monthly_joins = joins_df.groupby('join_month').size().reset_index(name='count')
-        monthly_joins['join_month'] = monthly_joins['join_month'].dt.to_timestamp()
-        
-        # Get monthly drops (for businesses that have dropped)
-        drops_df = df.dropna(subset=['date_dropped']).copy()
-        drops_df['drop_month'] = drops_df['date_dropped'].dt.to_period('M')
-        monthly_drops = drops_df.groupby('drop_month').size().reset_index(name='count')
-        monthly_drops['drop_month'] = monthly_drops['drop_month'].dt.to_timestamp()
-        
-        # Update joins count in summary dataframe
-        for _, row in monthly_joins.iterrows():
-            month = row['join_month']
-            count = row['count']
-            # Find matching row in summary_df
-            match_idx = summary_df[summary_df['year_month'] == month].index
-            if len(match_idx) > 0:
-                summary_df.loc[match_idx[0], 'new_joins'] = count
-        
-        # Update drops count in summary dataframe
-        for _, row in monthly_drops.iterrows():
-            month = row['drop_month']
-            count = row['count']
-            # Find matching row in summary_df
-            match_idx = summary_df[summary_df['year_month'] == month].index
-            if len(match_idx) > 0:
-                summary_df.loc[match_idx[0], 'new_drops'] = count
+        # Count monthly joins and drops (for businesses that have dropped) by month key,
+        # months without any get 0
+        summary_keys = _month_keys(summary_df['year_month'])
+        monthly_joins = pd.Series(_month_keys(accredited.dropna())).value_counts()
+        monthly_drops = pd.Series(_month_keys(dropped.dropna())).value_counts()
+        summary_df['new_joins'] = monthly_joins.reindex(summary_keys, fill_value=0).to_numpy(dtype=np.int32)
+        summary_df['new_drops'] = monthly_drops.reindex(summary_keys, fill_value=0).to_numpy(dtype=np.int32)
         
         # Calculate active businesses for each month
-        for i, row in summary_df.iterrows():
-            month_start = row['year_month']
-            month_end = month_start + pd.DateOffset(months=1) - pd.DateOffset(days=1)
-            
-            # Count businesses that joined before or during this month and either haven't dropped
-            # or dropped after this month
-            active_count = len(df[
-                (df['date_accredited'] <= month_end) & 
-                ((df['date_dropped'].isna()) | (df['date_dropped'] > month_start))
-            ])
-            
-            summary_df.at[i, 'active_businesses'] = active_count
+        # A business counts as active in a month if it joined on or before the last day of the month
+        # and either hasn't dropped or dropped after the first day. Instead of scanning all businesses
+        # for every month, find the month each one becomes active and the month it stops being active
+        # (never before it became active), then take a running total of those changes.
+        # The grid is searched in the unit of the dates: searchsorted won't round dates finer than
+        # the grid's unit, and the grid only holds whole days, so converting it is lossless (converting
+        # the dates instead could overflow, e.g. a 9999-12-31 sentinel in nanoseconds)
+        month_ends = date_range + pd.offsets.MonthEnd(0)
+        n_months = len(date_range)
+        active_from = np.where(accredited.isna(), n_months, month_ends.as_unit(accredited.dt.unit).searchsorted(accredited, side='left'))
+        inactive_from = np.where(dropped.isna(), n_months, date_range.as_unit(dropped.dt.unit).searchsorted(dropped, side='left'))
+        inactive_from = np.maximum(active_from, inactive_from)
+        
+        changes = np.bincount(active_from, minlength=n_months + 1) - np.bincount(inactive_from, minlength=n_months + 1)
+        summary_df['active_businesses'] = np.cumsum(changes[:n_months]).astype(np.int32)
         
         # Format columns for better readability
-        summary_df['year'] = summary_df['year_month'].dt.year
-        summary_df['month'] = summary_df['year_month'].dt.month
-        summary_df['month_name'] = summary_df['year_month'].dt.strftime('%b')
+        summary_df = _add_month_columns(summary_df)
         
         # Reorder columns
         summary_df = summary_df[[
@@ -240,10 +309,62 @@ def create_monthly_business_summary(df, start_year=2010):
             'active_businesses', 'new_joins', 'new_drops'
         ]]
         
-        logger.info(f"Created monthly business summary from {start_year} to {current_date.year}-{current_date.month}")
+        logger.info("Created monthly business summary from %s to %s-%s", date_range[0].year, date_range[-1].year, date_range[-1].month)
         return summary_df
     except Exception as e:
-        logger.error(f"Error creating monthly business summary: {e}")
+        logger.error("Error creating monthly business summary: %s", e)
+        raise
+
+def create_monthly_summary_from_counts(monthly_counts_df, start_year=2010, month_grid=None):
+    """
+    Create the monthly business summary from counts already aggregated by month
+    (see extract_monthly_business_counts) instead of per-business rows
+
+    Parameters:
+    - monthly_counts_df: DataFrame with year, month, new_joins, new_drops,
+      active_adds and active_removals columns
+    - start_year: First year to include in the summary
+    - month_grid: Optional prebuilt month range (see monthly_date_range) to use instead of
+      building it from start_year
+
+    Returns:
+    - DataFrame with the same columns as create_monthly_business_summary
+    """
+    try:
+        # Create date range from the first day of start_year to the first day of the current month
+        date_range = monthly_date_range(start_year) if month_grid is None else month_grid
+
+        summary_df = _add_month_columns(pd.DataFrame({'year_month': date_range}))
+
+        # Month keys (year * 12 + month - 1) for the summary range and the counts
+        summary_keys = (summary_df['year'] * 12 + summary_df['month'] - 1).to_numpy()
+        counts_df = monthly_counts_df.assign(
+            month_key=monthly_counts_df['year'] * 12 + monthly_counts_df['month'] - 1
+        ).sort_values('month_key')
+        count_keys = counts_df['month_key'].to_numpy()
+
+        # Joins and drops that happened in each month
+        counts_by_key = counts_df.set_index('month_key')
+        summary_df['new_joins'] = counts_by_key['new_joins'].reindex(summary_keys, fill_value=0).to_numpy()
+        summary_df['new_drops'] = counts_by_key['new_drops'].reindex(summary_keys, fill_value=0).to_numpy()
+
+        # Active businesses: everything that became active up to this month minus
+        # everything that became inactive up to this month (including earlier years)
+        positions = np.searchsorted(count_keys, summary_keys, side='right')
+        cum_adds = np.concatenate([[0], counts_df['active_adds'].to_numpy().cumsum()])
+        cum_removals = np.concatenate([[0], counts_df['active_removals'].to_numpy().cumsum()])
+        summary_df['active_businesses'] = cum_adds[positions] - cum_removals[positions]
+
+        # Reorder columns
+        summary_df = summary_df[[
+            'year_month', 'year', 'month', 'month_name',
+            'active_businesses', 'new_joins', 'new_drops'
+        ]]
+
+        logger.info("Created monthly business summary from counts from %s to %s-%s", date_range[0].year, date_range[-1].year, date_range[-1].month)
+        return downcast_counts(summary_df)
+    except Exception as e:
+        logger.error("Error creating monthly business summary from counts: %s", e)
         raise
 
 def prepare_summary_for_forecast(monthly_summary_df, lookback_years=5):
@@ -262,18 +383,15 @@ def prepare_summary_for_forecast(monthly_summary_df, lookback_years=5):
         if not pd.api.types.is_datetime64_any_dtype(monthly_summary_df['year_month']):
             monthly_summary_df['year_month'] = pd.to_datetime(monthly_summary_df['year_month'])
         
-        # Calculate cutoff date for lookback period
-        today = pd.to_datetime(datetime.now())
-        cutoff_date = today - pd.DateOffset(years=lookback_years)
-        
-        # Create current month first day
-        current_month_start = pd.Timestamp(year=today.year, month=today.month, day=1)
+        # Cutoff date for lookback period and current month first day
+        cutoff_date = _lookback_cutoff(lookback_years)
+        current_month_start = _current_month_start()
         
         # Filter to recent data only, excluding current month
         filtered_df = monthly_summary_df[
             (monthly_summary_df['year_month'] >= cutoff_date) & 
             (monthly_summary_df['year_month'] < current_month_start)
-        ].copy()
+        ]
         
         # Ensure data is sorted by date
         filtered_df = filtered_df.sort_values('year_month')
@@ -281,77 +399,57 @@ def prepare_summary_for_forecast(monthly_summary_df, lookback_years=5):
         # Reset index
         filtered_df = filtered_df.reset_index(drop=True)
         
-        logger.info(f"Prepared monthly summary for forecasting. Using data from {filtered_df['year_month'].min().strftime('%Y-%m-%d')} to {filtered_df['year_month'].max().strftime('%Y-%m-%d')}")
-        logger.info(f"Total periods for forecasting: {len(filtered_df)}")
-        logger.info(f"Excluded current incomplete month ({today.strftime('%B %Y')})")
+        logger.info("Prepared monthly summary for forecasting. Using data from %s to %s", filtered_df['year_month'].min().strftime('%Y-%m-%d'), filtered_df['year_month'].max().strftime('%Y-%m-%d'))
+        logger.info("Total periods for forecasting: %s", len(filtered_df))
+        logger.info("Excluded current incomplete month (%s)", current_month_start.strftime('%B %Y'))
         
         return filtered_df
     except Exception as e:
-        logger.error(f"Error preparing summary data for forecasting: {e}")
+        logger.error("Error preparing summary data for forecasting: %s", e)
         raise
     
 def correct_known_data_issues(monthly_summary_df):
     """
     Apply manual corrections to known data issues
-    Currently corrects:
+    Currently corrects (see KNOWN_DROP_CORRECTIONS):
     - January 2025: Drops changed from 109 to 134
     - February 2025: Drops changed from 163 to 136
     
+    Active businesses in the months after a corrected month are adjusted by the difference.
+    
     Parameters:
-    - monthly_summary_df: DataFrame containing monthly business summary
+    - monthly_summary_df: DataFrame containing monthly business summary, sorted by year_month
     
     Returns:
     - DataFrame with corrections applied
     """
     try:
-        # Make a copy to avoid modifying the original dataframe
-        corrected_df = monthly_summary_df.copy()
-        
-        # Apply corrections for January 2025
-        jan_2025_idx = corrected_df[
-            (corrected_df['year'] == 2025) & 
-            (corrected_df['month'] == 1)
-        ].index
-        
-        if len(jan_2025_idx) > 0:
-            # Original drops value
-            orig_drops = corrected_df.loc[jan_2025_idx[0], 'new_drops']
-            # Correct value
-            corrected_df.loc[jan_2025_idx[0], 'new_drops'] = 134
-            logger.info(f"Corrected January 2025 drops from {orig_drops} to 134")
+        year_months = pd.DatetimeIndex(monthly_summary_df['year_month'])
+        new_drops = monthly_summary_df['new_drops'].to_numpy().copy()
+        # Change of active businesses starting at each row, summed up once at the end
+        delta = np.zeros(len(monthly_summary_df) + 1, dtype=np.int64)
+        
+        for (year, month), correct_drops in KNOWN_DROP_CORRECTIONS.items():
+            month_start = pd.Timestamp(year=year, month=month, day=1)
+            idx = year_months.searchsorted(month_start)
+            if idx == len(year_months) or year_months[idx] != month_start:
+                continue
             
-            # Update active_businesses for all months after January 2025
-            # Difference between original and corrected value
-            diff = 134 - orig_drops
-            # Update all months after January 2025
-            corrected_df.loc[
-                corrected_df['year_month'] > pd.Timestamp('2025-01-01'),
-                'active_businesses'
-            ] -= diff
-        
-        # Apply corrections for February 2025
-        feb_2025_idx = corrected_df[
-            (corrected_df['year'] == 2025) & 
-            (corrected_df['month'] == 2)
-        ].index
-        
-        if len(feb_2025_idx) > 0:
             # Original drops value
-            orig_drops = corrected_df.loc[feb_2025_idx[0], 'new_drops']
-            # Correct value
-            corrected_df.loc[feb_2025_idx[0], 'new_drops'] = 136
-            logger.info(f"Corrected February 2025 drops from {orig_drops} to 136")
+            orig_drops = new_drops[idx]
+            new_drops[idx] = correct_drops
+            logger.info("Corrected %s drops from %s to %s", month_start.strftime('%B %Y'), orig_drops, correct_drops)
             
-            # Update active_businesses for all months after February 2025
-            # Difference between original and corrected value
-            diff = 136 - orig_drops
-            # Update all months after February 2025
-            corrected_df.loc[
-                corrected_df['year_month'] > pd.Timestamp('2025-02-01'),
-                'active_businesses'
-            ] -= diff
-        
-        return corrected_df
+            # Update active_businesses for all months after the corrected month
+            delta[idx + 1] += correct_drops - orig_drops
+        
+        # New dataframe with the corrected columns, the original dataframe isn't modified
+        corrected_df = monthly_summary_df.assign(
+            new_drops=new_drops,
+            active_businesses=monthly_summary_df['active_businesses'].to_numpy() - np.cumsum(delta[:-1])
+        )
+        
+        return downcast_counts(corrected_df)
     except Exception as e:
-        logger.error(f"Error correcting known data issues: {e}")
+        logger.error("Error correcting known data issues: %s", e)
         raise
\ No newline at end of file
@@ -19,7 +19,7 @@ def main():
         
         logger.info("Extract test completed successfully")
     except Exception as e:
-        logger.error(f"Test failed: {e}")
+        logger.error("Test failed: %s", e)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file